@@ -1,14 +1,17 @@
 import os
 import streamlit as st
 from dotenv import load_dotenv
+import io
+import re
 import subprocess
 import base64
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+import orjson
+import queue
 import time
-import pandas as pd
-import plotly.express as px
-
 from data_processing.fetch_tex import read_latex_file
 
 # Import the LangGraph-enabled functions from the main module
@@ -17,6 +20,24 @@ from main import generate_resume_with_tracking, read_json_file
 # Load environment variables from .env file
 load_dotenv()
 
+# Timestamp embedded in metrics filenames, compiled once at import
+_TS_RE = re.compile(r'generation_metrics_(\d{8}_\d{6})\.json')
+
+
+def _get_pandas():
+    """
+    Import pandas on first use so cold starts that never open the
+    metrics view skip its import cost entirely. sys.modules makes every
+    call after the first free.
+
+    Returns:
+        module: The pandas module
+    """
+    import pandas as pd
+    # Copy-on-write lets the metrics column selections stay zero-copy views
+    pd.options.mode.copy_on_write = True
+    return pd
+
 
 def ensure_directory(directory: str):
     """
@@ -39,61 +60,179 @@ def get_current_latex_resume():
     return read_latex_file()
 
 
-def convert_latex_to_pdf(latex_content: str, output_path: str) -> Path:
+class LatexCompiler:
     """
-    Convert LaTeX content to PDF using pdflatex with error checking.
-    
+    Resident pdflatex wrapper that keeps a pool of warm scratch
+    directories across renders instead of paying temp-dir setup per call.
+    Each compile checks out its own directory from the pool, so
+    concurrent Streamlit sessions compile in parallel without stepping
+    on each other's aux files. The compiled PDF is handed back as bytes
+    so callers never have to read it back from disk.
+    """
+    # Constructs that need a second pdflatex pass to resolve references
+    _SECOND_PASS_RE = re.compile(r"\\(?:ref|pageref|cite|tableofcontents|listof)")
+
+    def __init__(self, pool_size: int = 2):
+        # Prefer a RAM-backed tmpfs so pdflatex's .tex/.aux/.pdf round
+        # trips never hit durable storage
+        shm = Path('/dev/shm')
+        base_dir = str(shm) if shm.is_dir() else None
+        # Held for the lifetime of the process so pdflatex reuses its
+        # aux files between renders
+        self._workdirs = [
+            tempfile.TemporaryDirectory(prefix="resume_magic_", dir=base_dir)
+            for _ in range(pool_size)
+        ]
+        self._slots = queue.Queue()
+        for workdir in self._workdirs:
+            self._slots.put(Path(workdir.name))
+
+    def _run_pdflatex(self, tex_name: str, workdir: Path, draftmode: bool = False):
+        """
+        Run a single pdflatex pass in the scratch directory.
+
+        Args:
+            tex_name (str): Name of the .tex file inside the scratch dir
+            workdir (Path): The scratch directory to compile in
+            draftmode (bool): Skip PDF shipout (cheap reference-resolving pass)
+
+        Returns:
+            subprocess.CompletedProcess: The finished pdflatex process
+        """
+        cmd = ['pdflatex', '-interaction=batchmode', '-halt-on-error']
+        if draftmode:
+            cmd.append('-draftmode')
+        cmd.append(tex_name)
+        return subprocess.run(cmd, cwd=workdir, capture_output=True, text=True)
+
+    def compile(self, latex_content: str) -> bytes:
+        """
+        Compile LaTeX source to PDF bytes.
+        Documents with cross-references get a cheap -draftmode first pass
+        (no PDF shipout) so only the final pass pays full output cost.
+
+        Args:
+            latex_content (str): LaTeX document content as a string
+
+        Returns:
+            bytes: The compiled PDF document
+
+        Raises:
+            RuntimeError: If pdflatex fails to produce a PDF
+        """
+        # Check a warm scratch directory out of the pool; blocks only
+        # when every slot is compiling
+        workdir = self._slots.get()
+        try:
+            tex_path = workdir / "document.tex"
+            tex_path.write_text(latex_content, encoding='utf-8')
+
+            # batchmode + halt-on-error keeps pdflatex from blocking on
+            # prompts and bails out early on broken input
+            if self._SECOND_PASS_RE.search(latex_content):
+                result = self._run_pdflatex(tex_path.name, workdir, draftmode=True)
+                if result.returncode != 0:
+                    raise RuntimeError("pdflatex error:\n" + result.stdout + "\n" + result.stderr)
+            result = self._run_pdflatex(tex_path.name, workdir)
+
+            pdf_path = tex_path.with_suffix('.pdf')
+            if result.returncode != 0 or not pdf_path.exists():
+                raise RuntimeError("pdflatex error:\n" + result.stdout + "\n" + result.stderr)
+
+            return pdf_path.read_bytes()
+        finally:
+            self._slots.put(workdir)
+
+
+@st.cache_resource(show_spinner=False)
+def get_latex_compiler() -> LatexCompiler:
+    """
+    Get or create the shared LaTeX compiler instance.
+    Uses Streamlit's resource cache so the compiler (and its warm
+    working directory) survives reruns.
+
+    Returns:
+        LatexCompiler: The shared compiler instance
+    """
+    return LatexCompiler()
+
+
+@st.cache_data(show_spinner=False)
+def _compile_latex_cached(latex_digest: str, latex_content: str) -> bytes:
+    """
+    Compile LaTeX to PDF bytes, cached on the content digest.
+    Streamlit reruns with unchanged LaTeX (e.g. toggling the metrics
+    view) short-circuit at the cache lookup instead of re-running pdflatex.
+
     Args:
+        latex_digest (str): blake2b digest of the LaTeX content (cache key)
         latex_content (str): LaTeX document content as a string
-        output_path (str): Path where the PDF should be saved
-        
+
     Returns:
-        Path: Path to the generated PDF file, or None if generation failed
+        bytes: The compiled PDF document
+    """
+    return get_latex_compiler().compile(latex_content)
+
+
+def convert_latex_to_pdf(latex_content: str, output_path: str = None) -> bytes:
+    """
+    Convert LaTeX content to PDF bytes using the shared pdflatex compiler.
+    Compilation happens in the compiler's RAM-backed scratch directory;
+    the PDF only touches durable storage when output_path is given.
+
+    Args:
+        latex_content (str): LaTeX document content as a string
+        output_path (str): Optional path to persist the PDF to
+
+    Returns:
+        bytes: The compiled PDF document, or None if generation failed
     """
     try:
-        output_path = Path(output_path)
-        # Ensure the output directory exists
-        ensure_directory(output_path.parent)
-        
-        # Create a temporary .tex file
-        temp_tex_path = output_path.with_suffix('.tex')
-        with open(temp_tex_path, 'w', encoding='utf-8') as f:
-            f.write(latex_content)
-        
-        # Run pdflatex to convert the .tex file to PDF
-        result = subprocess.run(
-            ['pdflatex', '-interaction=nonstopmode', str(temp_tex_path)],
-            cwd=temp_tex_path.parent,
-            capture_output=True,
-            text=True
-        )
-        
-        # Check for errors
-        if result.returncode != 0:
-            st.error("pdflatex error:\n" + result.stdout + "\n" + result.stderr)
-            return None
-            
-        return output_path.with_suffix('.pdf')
+        # Compile (or fetch from the content-keyed cache)
+        digest = hashlib.blake2b(latex_content.encode('utf-8'), digest_size=16).hexdigest()
+        pdf_bytes = _compile_latex_cached(digest, latex_content)
+
+        # Persist only when the caller actually wants a file
+        if output_path:
+            output_path = Path(output_path).with_suffix('.pdf')
+            ensure_directory(output_path.parent)
+            output_path.write_bytes(pdf_bytes)
+
+        return pdf_bytes
     except Exception as e:
         st.error(f"Error converting LaTeX to PDF: {str(e)}")
         return None
 
 
-def display_pdf(pdf_path: Path):
+@st.cache_data(show_spinner=False)
+def _pdf_to_data_uri(pdf_path: str, mtime: float) -> str:
     """
-    Display PDF in Streamlit using an HTML iframe.
-    
+    Base64-encode a PDF into a data URI, cached on path + mtime.
+    Reruns that display the same unchanged PDF reuse the encoded string
+    instead of re-reading and re-encoding the file.
+
     Args:
-        pdf_path (Path): Path to the PDF file to display
+        pdf_path (str): Path to the PDF file
+        mtime (float): File modification time (cache-busting key)
+
+    Returns:
+        str: data:application/pdf URI for the file contents
     """
-    # Read the PDF file and encode it in base64
     with open(pdf_path, "rb") as f:
         base64_pdf = base64.b64encode(f.read()).decode('utf-8')
-    
-    # Create an iframe to display the PDF
+    return f"data:application/pdf;base64,{base64_pdf}"
+
+
+def _render_pdf_iframe(data_uri: str):
+    """
+    Render a PDF data URI in Streamlit using an HTML iframe.
+
+    Args:
+        data_uri (str): data:application/pdf URI to embed
+    """
     pdf_display = f"""
         <iframe
-            src="data:application/pdf;base64,{base64_pdf}"
+            src="{data_uri}"
             width="100%"
             height="800px"
             type="application/pdf">
@@ -102,17 +241,56 @@ def display_pdf(pdf_path: Path):
     st.markdown(pdf_display, unsafe_allow_html=True)
 
 
+@st.cache_data(show_spinner=False)
+def _pdf_bytes_to_data_uri(pdf_digest: str, pdf_bytes: bytes) -> str:
+    """
+    Base64-encode in-memory PDF bytes into a data URI, cached on digest.
+
+    Args:
+        pdf_digest (str): blake2b digest of the PDF bytes (cache key)
+        pdf_bytes (bytes): The PDF document
+
+    Returns:
+        str: data:application/pdf URI for the bytes
+    """
+    return "data:application/pdf;base64," + base64.b64encode(pdf_bytes).decode('utf-8')
+
+
+def display_pdf_bytes(pdf_bytes: bytes):
+    """
+    Display an in-memory PDF in Streamlit without touching disk.
+
+    Args:
+        pdf_bytes (bytes): The PDF document to display
+    """
+    digest = hashlib.blake2b(pdf_bytes, digest_size=16).hexdigest()
+    _render_pdf_iframe(_pdf_bytes_to_data_uri(digest, pdf_bytes))
+
+
+def display_pdf(pdf_path: Path):
+    """
+    Display PDF in Streamlit using an HTML iframe.
+
+    Args:
+        pdf_path (Path): Path to the PDF file to display
+    """
+    # Encode once per file version; cached across reruns
+    _render_pdf_iframe(_pdf_to_data_uri(str(pdf_path), os.path.getmtime(pdf_path)))
+
+
 def reset_app():
     """
     Reset session state variables to clear the application state.
     Removes all generated content and user inputs.
     """
     keys_to_reset = [
-        "generation_result", 
-        "current_latex_resume", 
-        "company_name", 
-        "job_description", 
-        "show_metrics"
+        "generation_result",
+        "current_latex_resume",
+        "company_name",
+        "job_description",
+        "show_metrics",
+        "cl_pdf_bytes",
+        "cl_pdf_key"
     ]
     for key in keys_to_reset:
         st.session_state.pop(key, None)
@@ -127,7 +305,7 @@ def display_metrics(metrics: dict):
     """
     if not metrics:
         return
-        
+
     st.subheader("📊 Generation Metrics")
     
     # Display key metrics in two columns
@@ -143,24 +321,74 @@ def display_metrics(metrics: dict):
         st.metric("Prompt Tokens", metrics.get('prompt_tokens', 0))
         st.metric("Model", metrics.get('model_name', 'Unknown'))
     
-    # Create a bar chart of token usage
-    token_data = {
-        'Category': ['Prompt Tokens', 'Completion Tokens'],
-        'Count': [metrics.get('prompt_tokens', 0), metrics.get('completion_tokens', 0)]
-    }
-    token_df = pd.DataFrame(token_data)
-    fig = px.bar(
-        token_df, 
-        x='Category', 
-        y='Count',
-        title='Token Usage Breakdown',
-        color='Category', 
-        color_discrete_map={
-            'Prompt Tokens': '#3498db',
-            'Completion Tokens': '#2ecc71'
-        }
+    # Create a bar chart of token usage straight from a dict — two rows
+    # don't justify a DataFrame allocation
+    st.caption("Token Usage Breakdown")
+    st.vega_lite_chart(
+        {
+            'mark': 'bar',
+            'data': {'values': [
+                {'Category': 'Prompt Tokens', 'Count': metrics.get('prompt_tokens', 0)},
+                {'Category': 'Completion Tokens', 'Count': metrics.get('completion_tokens', 0)},
+            ]},
+            'encoding': {
+                'x': {'field': 'Category', 'type': 'nominal'},
+                'y': {'field': 'Count', 'type': 'quantitative'},
+                'color': {'field': 'Category', 'type': 'nominal'},
+            },
+        },
+        use_container_width=True,
     )
-    st.plotly_chart(fig, use_container_width=True)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _load_all_metrics(dir_mtime: float, log_mtime: float) -> "pd.DataFrame":
+    """
+    Load the metrics run log (plus any legacy per-run JSON files) into a
+    single DataFrame. Cached for 60s and keyed on the directory and log
+    mtimes, so reruns with no new runs skip the whole read.
+
+    Args:
+        dir_mtime (float): Metrics directory mtime (cache-busting key)
+        log_mtime (float): Run-log file mtime (cache-busting key)
+
+    Returns:
+        pd.DataFrame: One row per generation run, or empty if none parse
+    """
+    pd = _get_pandas()
+
+    # Current runs live as one record per line in the append-only log
+    lines = []
+    log_path = Path("./metrics/generation_metrics.jsonl")
+    if log_path.exists():
+        lines.extend(line for line in log_path.read_bytes().splitlines() if line.strip())
+
+    # Legacy runs: one pretty-printed file per generation, timestamp in
+    # the filename; normalize each to one compact line. os.scandir gives
+    # names and full paths in a single directory pass
+    try:
+        entries = [e for e in os.scandir("./metrics") if e.name.endswith('.json')]
+    except FileNotFoundError:
+        entries = []
+    for entry in entries:
+        ts_match = _TS_RE.match(entry.name)
+        if not ts_match:
+            continue
+        try:
+            record = orjson.loads(Path(entry.path).read_bytes())
+        except orjson.JSONDecodeError:
+            continue
+        record['timestamp'] = ts_match.group(1)
+        lines.append(orjson.dumps(record))
+
+    if not lines:
+        return pd.DataFrame()
+
+    # One vectorized NDJSON parse with Arrow-backed dtypes instead of
+    # Python-level DataFrame construction from a list of dicts
+    metrics_df = pd.read_json(io.BytesIO(b"\n".join(lines)), lines=True, dtype_backend="pyarrow")
+    metrics_df['timestamp'] = pd.to_datetime(metrics_df['timestamp'], format='%Y%m%d_%H%M%S')
+    return metrics_df.sort_values('timestamp')
 
 
 def display_historical_metrics():
@@ -169,72 +397,97 @@ def display_historical_metrics():
     Reads and processes all metric JSON files from the metrics directory.
     """
     metrics_dir = "./metrics"
-    
-    # Check if metrics directory exists
-    if not os.path.exists(metrics_dir):
+
+    # One stat doubles as the existence check and the cache key
+    try:
+        dir_mtime = os.stat(metrics_dir).st_mtime
+    except FileNotFoundError:
         st.info("No historical metrics available yet")
         return
-        
-    # Get all JSON files in the metrics directory
-    metrics_files = [os.path.join(metrics_dir, f) for f in os.listdir(metrics_dir) if f.endswith('.json')]
-    if not metrics_files:
+
+    # Load all metrics (cached across reruns until new runs land)
+    try:
+        log_mtime = os.path.getmtime(os.path.join(metrics_dir, "generation_metrics.jsonl"))
+    except FileNotFoundError:
+        log_mtime = 0.0
+    metrics_df = _load_all_metrics(dir_mtime, log_mtime)
+    if metrics_df.empty:
         st.info("No historical metrics available yet")
         return
     
-    # Load all metrics files into a list of dictionaries
-    all_metrics = []
-    for file_path in metrics_files:
-        try:
-            with open(file_path, 'r') as f:
-                metrics = json.load(f)
-            # Extract timestamp from filename
-            filename = os.path.basename(file_path)
-            timestamp = filename.replace('generation_metrics_', '').replace('.json', '')
-            metrics['timestamp'] = timestamp
-            all_metrics.append(metrics)
-        except Exception:
-            continue
-            
-    if not all_metrics:
-        st.info("No valid metrics data found")
-        return
-    
-    # Convert to DataFrame for visualization
-    metrics_df = pd.DataFrame(all_metrics)
-    metrics_df['timestamp'] = pd.to_datetime(metrics_df['timestamp'], format='%Y%m%d_%H%M%S')
-    metrics_df = metrics_df.sort_values('timestamp')
-    
     st.subheader("📈 Historical Performance")
     
     # Plot token usage over time
     if 'total_tokens_used' in metrics_df.columns:
-        fig = px.line(
-            metrics_df, 
-            x='timestamp', 
-            y='total_tokens_used',
-            title='Token Usage Over Time',
-            labels={'total_tokens_used': 'Total Tokens', 'timestamp': 'Date'}
+        st.caption("Token Usage Over Time")
+        st.line_chart(
+            metrics_df.set_index('timestamp')[['total_tokens_used']],
+            x_label='Date',
+            y_label='Total Tokens'
         )
-        st.plotly_chart(fig, use_container_width=True)
-    
+
     # Plot generation time over time
     if 'resume_generation_time' in metrics_df.columns:
-        time_df = metrics_df[['timestamp', 'resume_generation_time']].copy()
-        time_df.columns = ['timestamp', 'Generation Time (s)']
-        fig = px.line(
-            time_df,
-            x='timestamp', 
-            y='Generation Time (s)',
-            title='Generation Time Over Time',
-            labels={'timestamp': 'Date'}
+        st.caption("Generation Time Over Time")
+        st.line_chart(
+            metrics_df.set_index('timestamp')[['resume_generation_time']],
+            x_label='Date',
+            y_label='Generation Time (s)'
         )
-        st.plotly_chart(fig, use_container_width=True)
     
     # Show raw data in an expandable section
     with st.expander("View Raw Metrics Data"):
         st.dataframe(metrics_df)
 
 
+@st.fragment
+def render_cover_letter_section(result: dict):
+    """
+    Render the cover letter preview and LaTeX source inside a fragment.
+    Interactions here (and elsewhere on the page) rerun only this
+    fragment instead of the whole main() flow.
+
+    Args:
+        result (dict): Generation result containing the cover letter
+    """
+    st.markdown("---")
+    st.subheader("Cover Letter")
+    # Reuse the bytes kept for this exact cover letter; a new
+    # generation changes the digest and forces a recompile instead of
+    # replaying the previous run's PDF
+    cl_key = hashlib.blake2b(
+        result["cover_letter"].encode('utf-8'), digest_size=16
+    ).hexdigest()
+    if st.session_state.get("cl_pdf_key") != cl_key:
+        cl_pdf_bytes = convert_latex_to_pdf(result["cover_letter"])
+        if cl_pdf_bytes:
+            st.session_state["cl_pdf_bytes"] = cl_pdf_bytes
+            st.session_state["cl_pdf_key"] = cl_key
+    if st.session_state.get("cl_pdf_bytes"):
+        st.subheader("Cover Letter Preview")
+        display_pdf_bytes(st.session_state["cl_pdf_bytes"])
+    with st.expander("View Cover Letter LaTeX Source"):
+        st.code(result["cover_letter"], language="tex")
+
+
+@st.fragment
+def render_metrics_section():
+    """
+    Render the metrics tabs inside a fragment so tab switches and chart
+    interactions don't rerun the form and results sections.
+    """
+    st.markdown("---")
+    tabs = st.tabs(["Current Generation", "Historical Metrics"])
+    with tabs[0]:
+        result = st.session_state.generation_result
+        if result and result.get("metrics"):
+            display_metrics(result["metrics"])
+        else:
+            st.info("No metrics available for the current generation")
+    with tabs[1]:
+        display_historical_metrics()
+
+
 def main():
     """
     Main application function for the Streamlit interface.
@@ -306,17 +559,23 @@ def main():
         st.session_state.job_description = job_description
         
         try:
-            # Read the current resume template
+            # Read the resume template and profile concurrently; both
+            # calls release the GIL around disk I/O, so a cold start
+            # only pays for the slower of the two reads
             with st.spinner("Reading current resume template..."):
-                st.session_state.current_latex_resume = get_current_latex_resume()
-                
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    template_future = executor.submit(get_current_latex_resume)
+                    profile_future = executor.submit(read_json_file, './data/detailed_resume.json')
+                    st.session_state.current_latex_resume = template_future.result()
+                    comprehensive_profile = profile_future.result()
+
             # Generate the customized resume
             with st.spinner("🎯 Customizing your resume..."):
                 generation_start = time.time()
                 result = generate_resume_with_tracking(
                     company_name=company_name,
                     current_latex_resume=st.session_state.current_latex_resume,
-                    comprehensive_profile=read_json_file('./data/detailed_resume.json'),
+                    comprehensive_profile=comprehensive_profile,
                     company_job_description=job_description,
                     generate_cover_letter=generate_cl
                 )
@@ -338,14 +597,7 @@ def main():
                 
                 # Display cover letter if generated
                 if result.get("cover_letter"):
-                    st.markdown("---")
-                    st.subheader("Cover Letter")
-                    cl_pdf_path = convert_latex_to_pdf(result["cover_letter"], "./pdfs/temp_cl_output.pdf")
-                    if cl_pdf_path:
-                        st.subheader("Cover Letter Preview")
-                        display_pdf(cl_pdf_path)
-                    with st.expander("View Cover Letter LaTeX Source"):
-                        st.code(result["cover_letter"], language="tex")
+                    render_cover_letter_section(result)
         except Exception as e:
             st.error(f"An error occurred: {str(e)}")
             st.error("Please check your inputs and try again.")
@@ -362,26 +614,11 @@ def main():
         
         # Display cover letter if it exists
         if result.get("cover_letter"):
-            st.markdown("---")
-            st.subheader("Cover Letter")
-            cl_pdf_path = convert_latex_to_pdf(result["cover_letter"], "./pdfs/temp_cl_output.pdf")
-            if cl_pdf_path:
-                st.subheader("Cover Letter Preview")
-                display_pdf(cl_pdf_path)
-            with st.expander("View Cover Letter LaTeX Source"):
-                st.code(result["cover_letter"], language="tex")
+            render_cover_letter_section(result)
     
     # Display metrics if enabled
     if st.session_state.show_metrics:
-        st.markdown("---")
-        tabs = st.tabs(["Current Generation", "Historical Metrics"])
-        with tabs[0]:
-            if st.session_state.generation_result and st.session_state.generation_result.get("metrics"):
-                display_metrics(st.session_state.generation_result["metrics"])
-            else:
-                st.info("No metrics available for the current generation")
-        with tabs[1]:
-            display_historical_metrics()
+        render_metrics_section()
 
 
 if __name__ == "__main__":
@@ -1,5 +1,23 @@
 
 import os
+from functools import lru_cache
+from pathlib import Path
+
+@lru_cache(maxsize=4)
+def _read_cached(file_path: str, mtime_ns: int) -> str:
+    """
+    Read and strip a LaTeX file, cached on path + mtime.
+    The mtime key invalidates the cache automatically when the file
+    changes, so repeated calls skip disk I/O and UTF-8 decoding.
+
+    Args:
+        file_path (str): The path to the LaTeX file.
+        mtime_ns (int): File modification time in nanoseconds (cache key).
+
+    Returns:
+        str: The stripped content of the LaTeX file.
+    """
+    return Path(file_path).read_text(encoding='utf-8').strip()
 
 def read_latex_file(file_path = './data/current_resume.tex'):
     """
@@ -11,13 +29,11 @@ def read_latex_file(file_path = './data/current_resume.tex'):
     Returns:
         str: The formatted content of the LaTeX file.
     """
-    
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        # Return the formatted string
-        return content.strip()
+        # Cached on mtime, so unchanged files are read from disk only once
+        return _read_cached(file_path, os.stat(file_path).st_mtime_ns)
     except FileNotFoundError:
         return f"Error: The file at '{file_path}' was not found."
     except Exception as e:
-        return f"An error occurred: {e}"
\ No newline at end of file
+        return f"An error occurred: {e}"
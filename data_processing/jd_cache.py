@@ -0,0 +1,185 @@
+import json
+import math
+import os
+import re
+import sqlite3
+import zlib
+
+# Words that make up job-description shingles
+_WORD_RE = re.compile(r"[A-Za-z0-9+#.]+")
+
+# Number of consecutive words per shingle
+_SHINGLE_SIZE = 3
+
+
+def _shingle_signature(text: str) -> set:
+    """
+    Build a hashed word-shingle signature for a job description.
+    Uses crc32 so signatures are stable across processes (Python's
+    built-in hash is salted per process).
+
+    Args:
+        text (str): Job description text
+
+    Returns:
+        set: 32-bit shingle hashes for the text
+    """
+    words = _WORD_RE.findall(text.lower())
+    return {
+        zlib.crc32(" ".join(words[i:i + _SHINGLE_SIZE]).encode('utf-8'))
+        for i in range(max(len(words) - _SHINGLE_SIZE + 1, 1))
+    }
+
+
+def _tf_vector(text: str) -> dict:
+    """
+    Build a hashed term-frequency vector for a job description.
+    Word order is ignored, so reworded postings with the same
+    vocabulary still score high under cosine similarity.
+
+    Args:
+        text (str): Job description text
+
+    Returns:
+        dict: Mapping of 32-bit word hashes to occurrence counts
+    """
+    vector = {}
+    for word in _WORD_RE.findall(text.lower()):
+        key = zlib.crc32(word.encode('utf-8'))
+        vector[key] = vector.get(key, 0) + 1
+    return vector
+
+
+def _cosine(a: dict, b: dict) -> float:
+    """
+    Cosine similarity between two hashed term-frequency vectors.
+
+    Args:
+        a (dict): First vector
+        b (dict): Second vector
+
+    Returns:
+        float: Similarity in [0, 1]
+    """
+    if not a or not b:
+        return 0.0
+    if len(b) < len(a):
+        a, b = b, a
+    dot = sum(count * b.get(key, 0) for key, count in a.items())
+    if not dot:
+        return 0.0
+    norm_a = math.sqrt(sum(count * count for count in a.values()))
+    norm_b = math.sqrt(sum(count * count for count in b.values()))
+    return dot / (norm_a * norm_b)
+
+
+def _jaccard(a: set, b: set) -> float:
+    """
+    Jaccard similarity between two shingle signatures.
+
+    Args:
+        a (set): First signature
+        b (set): Second signature
+
+    Returns:
+        float: Similarity in [0, 1]
+    """
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class JobDescriptionCache:
+    """
+    SQLite-backed cache mapping job-description signatures to previously
+    generated resumes. A new JD that is a near-duplicate of a cached one
+    (cosine similarity over hashed term-frequency vectors, with word
+    shingles as a tie-breaking signal) can reuse the prior resume and
+    skip the LLM entirely.
+    """
+    def __init__(self, db_path: str = "./checkpoints/jd_sigs.sqlite"):
+        """
+        Open (or create) the signature database.
+
+        Args:
+            db_path (str): Path to the SQLite database file
+        """
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jd_cache ("
+            "company_name TEXT, signature TEXT, generated_resume TEXT)"
+        )
+        # Older databases predate the term-frequency column
+        try:
+            self._conn.execute("ALTER TABLE jd_cache ADD COLUMN tf TEXT")
+        except sqlite3.OperationalError:
+            pass
+        self._conn.commit()
+
+    def find_similar(self, job_description: str, threshold: float = 0.92):
+        """
+        Look up the most similar cached job description. Rows carrying
+        a term-frequency vector are scored with cosine similarity
+        (robust to rewording); legacy rows fall back to shingle
+        Jaccard, which requires closer to verbatim duplication.
+
+        Args:
+            job_description (str): Job description text to match
+            threshold (float): Minimum similarity for a hit
+
+        Returns:
+            tuple: (company_name, generated_resume) of the best match at
+                or above the threshold, or None if nothing qualifies
+        """
+        signature = _shingle_signature(job_description)
+        vector = _tf_vector(job_description)
+        best = None
+        best_similarity = threshold
+        rows = self._conn.execute(
+            "SELECT company_name, signature, generated_resume, tf FROM jd_cache"
+        )
+        for company_name, stored_signature, generated_resume, stored_tf in rows:
+            if stored_tf:
+                stored_vector = {
+                    int(key): count
+                    for key, count in json.loads(stored_tf).items()
+                }
+                similarity = _cosine(vector, stored_vector)
+            else:
+                similarity = _jaccard(signature, set(json.loads(stored_signature)))
+            if similarity >= best_similarity:
+                best_similarity = similarity
+                best = (company_name, generated_resume)
+        return best
+
+    def store(self, company_name: str, job_description: str, generated_resume: str):
+        """
+        Record a generated resume against its job-description signature.
+
+        Args:
+            company_name (str): Name of the target company
+            job_description (str): Job description the resume was built for
+            generated_resume (str): Generated LaTeX resume content
+        """
+        signature = json.dumps(sorted(_shingle_signature(job_description)))
+        tf = json.dumps(_tf_vector(job_description))
+        self._conn.execute(
+            "INSERT INTO jd_cache (company_name, signature, generated_resume, tf)"
+            " VALUES (?, ?, ?, ?)",
+            (company_name, signature, generated_resume, tf)
+        )
+        self._conn.commit()
+
+    def invalidate(self, company_name: str):
+        """
+        Drop all cached entries for a company, e.g. after its resume
+        goes stale or the underlying profile changes.
+
+        Args:
+            company_name (str): Company whose entries should be removed
+        """
+        self._conn.execute(
+            "DELETE FROM jd_cache WHERE company_name = ?", (company_name,)
+        )
+        self._conn.commit()
@@ -3,6 +3,28 @@ from typing import Any
 from typing import Optional
 
 class LaTeXResumeParser:
+    # Patterns for matching LaTeX content, compiled once at class
+    # creation and shared by every instance
+    _PATTERNS = [
+        re.compile(pattern, re.DOTALL | re.IGNORECASE)
+        for pattern in (
+            # Standard markdown LaTeX block
+            r"```latex\s*(.*?)\s*```",
+            # Generic code block that might contain LaTeX
+            r"```\s*(\\documentclass.*?)\s*```",
+            # Alternate format with latex keyword
+            r"```\s*latex\s*(.*?)\s*```",
+            # Basic code block containing LaTeX indicators
+            r"```\s*(.*?\\begin\{document\}.*?)```",
+        )
+    ]
+
+    # Indicators that content appears to be LaTeX, folded into a single
+    # alternation so validation is one linear scan instead of seven
+    _VALIDATE_RE = re.compile(
+        r"\\(?:documentclass|begin\{document\}|end\{document\}|section|subsection|textbf|textit)"
+    )
+
     def parse(self, text: str) -> str:
         """
         Parse LaTeX content from various LLM output formats.
@@ -17,21 +39,9 @@ class LaTeXResumeParser:
         Raises:
             ValueError: If no valid LaTeX content is found
         """
-        # print(text)
-        # Try different patterns for matching LaTeX content
-        patterns = [
-            # Standard markdown LaTeX block
-            r"```latex\s*(.*?)\s*```",
-            # Generic code block that might contain LaTeX
-            r"```\s*(\\documentclass.*?)\s*```",
-            # Alternate format with latex keyword
-            r"```\s*latex\s*(.*?)\s*```",
-            # Basic code block containing LaTeX indicators
-            r"```\s*(.*?\\begin\{document\}.*?)```"
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+        # Try the precompiled patterns for matching LaTeX content
+        for pattern in self._PATTERNS:
+            match = pattern.search(text)
             if match:
                 # Extract and clean the content
                 content = match.group(1).strip()
@@ -51,19 +61,44 @@ class LaTeXResumeParser:
         Returns:
             bool: True if content appears to be valid LaTeX
         """
-        latex_indicators = [
-            r"\\documentclass",
-            r"\\begin\{document\}",
-            r"\\end\{document\}",
-            r"\\section",
-            r"\\subsection",
-            r"\\textbf",
-            r"\\textit"
-        ]
-        
-        # Check if at least one LaTeX indicator is present
-        return any(re.search(indicator, content) for indicator in latex_indicators)
+        # Check if at least one LaTeX indicator is present; the regex
+        # engine short-circuits on the first hit like the old any() loop
+        return self._VALIDATE_RE.search(content) is not None
     
+    def splice_sections(self, original: str, sections: str) -> str:
+        """
+        Splice regenerated \section blocks into the original document.
+        Used with the sections-only prompt: the model emits just the
+        rewritten sections and the untouched preamble, postamble and
+        remaining sections are kept from the original resume.
+
+        Args:
+            original (str): The full original LaTeX resume
+            sections (str): One or more complete \section{...} blocks
+
+        Returns:
+            str: The original document with matching sections replaced
+        """
+        result = original
+        # Split the model output into per-section blocks
+        parts = re.split(r"(?=\\section\{)", sections)
+        for block in parts:
+            block = block.strip()
+            match = re.match(r"\\section\{([^}]*)\}", block)
+            if not match:
+                continue
+            title = re.escape(match.group(1))
+            # Replace the corresponding block up to the next section or
+            # the end of the document; unmatched sections are left as-is
+            result, count = re.subn(
+                r"\\section\{" + title + r"\}.*?(?=\\section\{|\\end\{document\})",
+                block.replace("\\", "\\\\") + "\n\n",
+                result,
+                count=1,
+                flags=re.DOTALL,
+            )
+        return result
+
     @property
     def type(self) -> str:
         """Return the type identifier for the parser."""
@@ -1,11 +1,177 @@
-cover_letter_template = """
-You are a professional cover letter writer. Your task is to create a compelling cover letter in LaTeX format that aligns the candidate’s experiences with the job description and the company’s needs. Use the provided data to craft a personalized and engaging letter.
+import json
+import re
+import sys
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+
+# Placeholder fields are simple identifiers; doubled braces are literals
+_FIELD_RE = re.compile(r"(?<!\{)\{(\w+)\}(?!\})")
+
+# Characters LaTeX treats specially in plain text, mapped to their
+# escaped forms; str.translate with a prebuilt table is one C-level
+# pass over the string
+_LATEX_TX = str.maketrans({
+    "%": r"\%",
+    "&": r"\&",
+    "_": r"\_",
+    "#": r"\#",
+    "$": r"\$",
+})
+
+
+def latex_safe(text: str) -> str:
+    """
+    Escape LaTeX-hostile characters in a value that will be embedded
+    verbatim in LaTeX output (e.g. a company name like "AT&T").
+
+    Args:
+        text (str): Raw text value
+
+    Returns:
+        str: The text with %, &, _, # and $ escaped
+    """
+    return text.translate(_LATEX_TX)
+
+
+class SafeDict(dict):
+    """
+    Lookup dict for str.format_map that leaves unknown placeholders in
+    place instead of raising KeyError. Callers then don't need to know
+    exactly which placeholders a given template version uses, and stray
+    braces inside resume or job-description content can't crash a
+    render.
+    """
+    def __missing__(self, key):
+        return "{" + key + "}"
+
+
+class CompiledTemplate:
+    """
+    A template pre-parsed into alternating literal and field segments,
+    so rendering is a list join instead of re-scanning the multi-KB
+    source for placeholders on every call.
+    """
+    def __init__(self, source: str):
+        """
+        Parse the template source once.
+
+        Args:
+            source (str): Template string with {placeholder} fields and
+                {{ }} escapes for literal braces
+        """
+        segments = _FIELD_RE.split(source)
+        # Even indices are literals (with brace escapes resolved), odd
+        # indices are field names
+        self._literals = [
+            seg.replace("{{", "{").replace("}}", "}") for seg in segments[0::2]
+        ]
+        self._fields = segments[1::2]
+
+    def render(self, mapping) -> str:
+        """
+        Render against a mapping (SafeDict semantics apply if the
+        mapping implements __missing__).
+
+        Args:
+            mapping: Mapping of field name to substitution value
+
+        Returns:
+            str: The rendered string
+        """
+        out = [self._literals[0]]
+        for field, literal in zip(self._fields, self._literals[1:]):
+            out.append(str(mapping[field]))
+            out.append(literal)
+        return "".join(out)
+
+
+@lru_cache(maxsize=None)
+def _compile_template(source: str) -> CompiledTemplate:
+    """
+    Get or build the CompiledTemplate for a template string.
+
+    Args:
+        source (str): Template source string
+
+    Returns:
+        CompiledTemplate: The parsed template, cached per source
+    """
+    return CompiledTemplate(source)
 
-Input data:
-- Company: {company_name}
-- Job Description: {company_job_description}
-- Candidate's Resume: {current_latex_resume}
-- Generated Custom Resume: {generated_resume}
+
+def safe_format(template: str, **fields) -> str:
+    """
+    Render a template with SafeDict semantics via its compiled form.
+
+    Args:
+        template (str): Template string with {placeholder} fields
+        **fields: Placeholder values to substitute
+
+    Returns:
+        str: The rendered string; unmatched placeholders are preserved
+    """
+    return _compile_template(template).render(SafeDict(**fields))
+
+
+@dataclass(frozen=True)
+class PromptParts:
+    """
+    A prompt template split into its static instruction prefix and the
+    dynamic suffix holding the per-call placeholders. Keeping every
+    byte of instruction prose ahead of the first substitution maximizes
+    the provider's automatic prompt-prefix cache hit, so the static
+    portion of repeated calls is nearly free.
+    """
+    static: str
+    dynamic: str
+
+    @property
+    def text(self) -> str:
+        """
+        The full template string (static prefix + dynamic suffix),
+        interned so repeated access returns the same object instead of
+        concatenating a fresh multi-KB string each time.
+        """
+        return sys.intern(self.static + self.dynamic)
+
+    def render(self, **fields) -> str:
+        """
+        Render the full template with SafeDict semantics: only the
+        dynamic suffix is scanned for substitutions, so the static
+        prefix stays byte-identical across calls (and prefix-cache
+        friendly) no matter what the field values contain.
+
+        Args:
+            **fields: Placeholder values to substitute
+
+        Returns:
+            str: The rendered prompt
+        """
+        return self.static + safe_format(self.dynamic, **fields)
+
+    @cached_property
+    def _compiled_dynamic(self) -> CompiledTemplate:
+        """The dynamic suffix pre-parsed for repeated rendering."""
+        return _compile_template(self.dynamic)
+
+
+# Instruction blocks shared verbatim between templates; interned so
+# every template holds a pointer to one canonical copy instead of
+# duplicating multi-KB strings at import
+_BLOCKS = {
+    "input_data": sys.intern("""### **Input Data:**
+The following fields are provided as input:
+- **current_latex_resume**: [{current_latex_resume}]
+- **comprehensive_profile_json**: [{comprehensive_profile_json}]
+- **company_name**: [{company_name}]
+- **company_job_description**: [{company_job_description}]
+"""),
+}
+
+
+cover_letter_parts = PromptParts(
+    static="""
+You are a professional cover letter writer. Your task is to create a compelling cover letter in LaTeX format that aligns the candidate’s experiences with the job description and the company’s needs. Use the provided data to craft a personalized and engaging letter.
 
 The cover letter should:
 - Express genuine enthusiasm for the role and company.
@@ -15,11 +181,11 @@ The cover letter should:
 
 The expected LaTeX structure is as follows, but you may adjust the format as needed for a polished final document:
 
-{Dear Hiring Manager,}
+{{Dear Hiring Manager,}}
 
 [Cover Letter Content]
 
-Sincerely,  
+Sincerely,
 [My Name]
 
 
@@ -27,21 +193,22 @@ Ensure that any special characters (like %) are handled correctly.
 
 Output Instruction:
 - Output should be in LaTeX format & no other text.
-"""
 
-current_prompt = """
-You are a professional resume writer with expertise in tailoring resumes to match specific job descriptions using LaTeX. Your task is to generate a customized LaTeX resume that accurately represents the candidate’s experiences and skills while ensuring alignment with the provided job description. You must integrate content from both the current LaTeX resume and the JSON candidate description, strictly adhering to ethical standards—no fabrication or exaggeration of details.
-
-### **Input Data:**  
-The following fields will be provided as input:
-- **company_name**: [{company_name}]
-- **company_job_description**: [{company_job_description}]
-- **comprehensive_profile_json**: [{comprehensive_profile_json}]
-- **current_latex_resume**: [{current_latex_resume}]
+""",
+    dynamic="""Input data:
+- Company: {company_name}
+- Job Description: {company_job_description}
+- Candidate's Resume: {current_latex_resume}
+- Generated Custom Resume: {generated_resume}
+""",
+)
+cover_letter_template = cover_letter_parts.text
 
-*Note: The data in these placeholders may be extensive. Ensure all critical details are carefully considered and included without loss of information due to length.*
+current_prompt_parts = PromptParts(
+    static="""
+You are a professional resume writer with expertise in tailoring resumes to match specific job descriptions using LaTeX. Your task is to generate a customized LaTeX resume that accurately represents the candidate’s experiences and skills while ensuring alignment with the provided job description. You must integrate content from both the current LaTeX resume and the JSON candidate description, strictly adhering to ethical standards—no fabrication or exaggeration of details.
 
-### **Guidelines:**  
+### **Guidelines:**
 
 #### **Content Integration & Rephrasing:**  
 - **Primary Focus:** Restructure and refine content from the current LaTeX resume and the JSON candidate description to align with the job description while ensuring accuracy and truthfulness.
@@ -66,8 +233,178 @@ The following fields will be provided as input:
 - **LaTeX Integrity:** Ensure the final LaTeX resume is free of errors and formatting issues.
 - **Commenting:** Include brief inline comments only where necessary to clarify formatting improvements.
 
-### **Return Format:**  
+### **Return Format:**
 Return **only** the complete, updated LaTeX resume code. Do not provide any explanations or commentary outside the LaTeX document.
 
 Your output must strictly follow these guidelines to produce a professional, well-structured, and ATS-friendly resume that effectively represents the candidate’s qualifications while aligning with the job description.
-"""
+
+""",
+    dynamic=_BLOCKS["input_data"] + """
+*Note: The data in these placeholders may be extensive. Ensure all critical details are carefully considered and included without loss of information due to length.*
+""",
+)
+current_prompt = current_prompt_parts.text
+
+sections_only_parts = PromptParts(
+    static="""
+You are a professional resume writer with expertise in tailoring resumes to match specific job descriptions using LaTeX. You will be given the candidate's current LaTeX resume, a JSON candidate description, the target company, and the job description.
+
+### **Guidelines:**
+- Rewrite **only** the sections that benefit from tailoring. Emit ONLY the updated `\\section{{...}}` blocks (for example Summary, Skills, Experience, Projects); every other part of the document is unchanged and must not be emitted.
+- Each emitted block must start with its `\\section{{...}}` header and contain the complete, final content for that section.
+- Use the STAR format (Situation, Task, Action, Result) for experience and project bullet points.
+- Do not fabricate or exaggerate any experiences or skills.
+- Keep the original LaTeX commands and formatting style of each section.
+
+### **Return Format:**
+Return only the updated `\\section{{...}}` blocks as LaTeX, wrapped in a ```latex code block, with no other text.
+
+""",
+    dynamic=_BLOCKS["input_data"],
+)
+sections_only_prompt = sections_only_parts.text
+
+combined_parts = PromptParts(
+    static="""
+You are a professional resume and cover letter writer with expertise in tailoring application materials to specific job descriptions using LaTeX. In a single pass, produce both a customized LaTeX resume and a matching LaTeX cover letter for the candidate.
+
+### **Guidelines:**
+
+#### **Resume:**
+- Restructure and refine content from the current LaTeX resume and the JSON candidate description to align with the job description while ensuring accuracy and truthfulness.
+- Maintain the core LaTeX elements (section headers, bullet points, overall layout) of the original resume.
+- Use the STAR format (Situation, Task, Action, Result) for experience and project bullet points.
+- Do not fabricate or exaggerate any experiences or skills.
+
+#### **Cover Letter:**
+- Express genuine enthusiasm for the role and company.
+- Highlight the most relevant experiences and skills, consistent with the tailored resume.
+- Demonstrate an understanding of the company's requirements and conclude with a clear call to action.
+- Produce a complete LaTeX document addressed to the hiring manager.
+
+### **Return Format:**
+Return a JSON object with exactly two keys:
+- "resume_latex": the complete, updated LaTeX resume code.
+- "cover_letter": the complete LaTeX cover letter code.
+Escape LaTeX content so the JSON is valid. Do not include any other text.
+
+""",
+    dynamic=_BLOCKS["input_data"],
+)
+combined_template = combined_parts.text
+
+# Short follow-up turn appended to the resume conversation. The cover
+# letter is requested as a continuation of the same exchange, so the
+# server's prompt cache already holds the resume prompt and the
+# generated resume and only this turn is new input.
+cover_letter_turn_parts = PromptParts(
+    static="""Now write a compelling cover letter in LaTeX format for the same application, based on the job description and the tailored resume above. The letter should:
+- Express genuine enthusiasm for the role and company.
+- Highlight the most relevant experiences and skills from the tailored resume.
+- Demonstrate an understanding of the company's requirements.
+- Conclude with a clear, strong call to action.
+Ensure that any special characters (like %) are handled correctly.
+Output should be in LaTeX format & no other text.
+
+""",
+    dynamic="""Company: {company_name}
+""",
+)
+cover_letter_turn = cover_letter_turn_parts.text
+
+
+# Registry of resume prompt versions for the parameterized builder
+_VERSIONS = {
+    "current": current_prompt_parts,
+    "sections_only": sections_only_parts,
+    "combined": combined_parts,
+    "cover_letter": cover_letter_parts,
+    "cover_letter_turn": cover_letter_turn_parts,
+}
+
+
+@lru_cache(maxsize=None)
+def build_resume_prompt(version: str) -> str:
+    """
+    Compose the full prompt string for a template version.
+    Cached so repeated calls return the same interned object.
+
+    Args:
+        version (str): One of "current", "sections_only", "combined",
+            "cover_letter"
+
+    Returns:
+        str: The composed template string
+
+    Raises:
+        KeyError: If the version is unknown
+    """
+    return _VERSIONS[version].text
+
+
+# Profile sections whose list items are filtered against the job
+# description before interpolation
+_TRIMMABLE_KEYS = {"skills", "experience", "education", "projects", "publications"}
+
+_JD_KEYWORD_RE = re.compile(r"[A-Za-z]{4,}")
+
+
+def trim_profile(profile_json_str: str, job_description: str) -> str:
+    """
+    Shrink the comprehensive-profile payload before it is interpolated
+    into a template. Items in the content-heavy sections (skills,
+    experience, education, projects, publications) are dropped when
+    they share no keywords with the job description; identity fields
+    and non-list sections pass through untouched. The result is
+    re-serialized with compact separators.
+
+    Args:
+        profile_json_str (str): Candidate profile as a JSON string
+        job_description (str): Job description text
+
+    Returns:
+        str: Compact JSON with low-relevance items removed; the
+            original string if it cannot be parsed as a JSON object
+    """
+    try:
+        profile = json.loads(profile_json_str)
+    except (ValueError, TypeError):
+        return profile_json_str
+    if not isinstance(profile, dict):
+        return profile_json_str
+
+    jd_words = set(_JD_KEYWORD_RE.findall(job_description.lower()))
+    trimmed = {}
+    for key, value in profile.items():
+        if key.lower() in _TRIMMABLE_KEYS and isinstance(value, list):
+            kept = [
+                item for item in value
+                if set(_JD_KEYWORD_RE.findall(json.dumps(item).lower())) & jd_words
+            ]
+            # Never empty a section outright; an irrelevant-looking
+            # section is still better than a missing one
+            trimmed[key] = kept or value
+        else:
+            trimmed[key] = value
+    return json.dumps(trimmed, separators=(",", ":"))
+
+
+# Placeholders any template in this module may reference. Validated at
+# import so a typo in a field name fails the process immediately
+# instead of surfacing as a KeyError on the first production render.
+_ALLOWED_FIELDS = {
+    "company_name",
+    "company_job_description",
+    "comprehensive_profile_json",
+    "current_latex_resume",
+    "generated_resume",
+}
+
+for _name, _parts in _VERSIONS.items():
+    _fields = set(_FIELD_RE.findall(_parts.text))
+    if not _fields <= _ALLOWED_FIELDS:
+        raise ValueError(
+            f"Template '{_name}' references unknown placeholders: "
+            f"{sorted(_fields - _ALLOWED_FIELDS)}"
+        )
+del _name, _parts, _fields
@@ -1,11 +1,53 @@
+import functools
+import mmap
 import os
 
-def get_job_text(file_path):
+# Files below this size are read with a plain os.read; mmap's fixed
+# setup cost only pays off on larger files
+_MMAP_THRESHOLD = 64 * 1024
+
+
+@functools.lru_cache(maxsize=128)
+def _read(file_path, mtime, max_bytes=None):
+    """
+    Read a file's content, cached by path, modification time and byte
+    cap. The mtime key invalidates the cache entry whenever the file
+    changes on disk. Small reads go through one os.read; larger ones
+    are memory-mapped so the kernel pages them in without an extra
+    intermediate copy.
+
+    Args:
+        file_path (str): The path to the file.
+        mtime (float): The file's modification time, part of the cache key.
+        max_bytes (int): Optional cap on the number of bytes read.
+
+    Returns:
+        str: The content of the file as a string.
+    """
+    fd = os.open(file_path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        if max_bytes is not None and max_bytes < size:
+            # A byte cap can land mid-character; drop the partial tail
+            return os.read(fd, max_bytes).decode('utf-8', errors='ignore')
+        if size > _MMAP_THRESHOLD:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                return str(memoryview(mm), 'utf-8')
+        return os.read(fd, size).decode('utf-8')
+    finally:
+        os.close(fd)
+
+
+def get_job_text(file_path, max_bytes=None):
     """
     Reads the content of a file and returns it as a string.
+    Repeated reads of an unchanged file are served from an in-process
+    cache instead of re-reading and re-decoding from disk.
 
     Args:
         file_path (str): The path to the file.
+        max_bytes (int): Optional cap on the bytes read; long postings
+            past the cap rarely add useful prompt content.
 
     Returns:
         str: The content of the file as a string.
@@ -13,17 +55,11 @@ def get_job_text(file_path):
     Raises:
         FileNotFoundError: If the file does not exist.
         PermissionError: If the file cannot be accessed due to insufficient permissions.
-        Exception: For any other issues that occur while reading the file.
+        OSError: For any other issues that occur while reading the file.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
-        return content
+        return _read(file_path, os.path.getmtime(file_path), max_bytes)
     except FileNotFoundError:
         raise FileNotFoundError(f"The file at '{file_path}' was not found.")
     except PermissionError:
         raise PermissionError(f"Permission denied to read the file at '{file_path}'.")
-    except Exception as e:
-        raise Exception(f"An error occurred while reading the file: {e}")
-
-
@@ -1 +0,0 @@
-from langgraph.checkpoint import JsonCheckpoint
\ No newline at end of file